@@ -2,64 +2,143 @@
 import os
 import csv
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    from charset_normalizer import from_bytes  # ships with requests
+except ImportError:
+    from_bytes = None
 from urllib.parse import urljoin, urlparse
 import io
 import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+MAX_DOWNLOAD_WORKERS = 16
+
+# How many bytes from the end of a log are enough to contain the result line
+TAIL_BYTES = 4096
+
+# Matches href="...log" in the Apache directory listing; the hrefs are the
+# only thing we need from the HTML, so a regex replaces the full parse
+_HREF_LOG_RE = re.compile(r'href=["\']([^"\']+\.log)["\']', re.IGNORECASE)
+
+# Match both with and without .log extension for backward compatibility
+_GAME_RE = re.compile(r'game(\d+)(\.log)?$')
+
+def make_session(headers):
+    """Create a session that reuses keep-alive connections to the log server"""
+    session = requests.Session()
+    session.headers.update(headers)
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=32,
+        max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[502, 503, 504])
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
 def get_existing_game_max(output_dir):
     """Get the maximum game number from existing files in specific directory"""
     if not os.path.exists(output_dir):
         return 0
-    
-    max_num = 0
-    for filename in os.listdir(output_dir):
-        # Match both with and without .log extension for backward compatibility
-        match = re.match(r'game(\d+)(\.log)?$', filename)
-        if match:
-            num = int(match.group(1))
-            max_num = max(max_num, num)
-    return max_num
+
+    # scandir iterates the directory without building a full name list
+    with os.scandir(output_dir) as entries:
+        return max(
+            (int(m.group(1)) for e in entries for m in (_GAME_RE.match(e.name),) if m),
+            default=0
+        )
+
+# Non-UTF-8 encoding detected during the current crawl; one log directory's
+# files share an encoding, so detection only has to run once
+_detected_encoding = None
 
 def decode_content(content_bytes):
-    """Try to decode content with fallback encodings"""
-    encodings = ['utf-8-sig', 'utf-8', 'cp932', 'latin-1']
-    
-    for encoding in encodings:
+    """Decode content: UTF-8 fast path, charset detection on failure"""
+    global _detected_encoding
+
+    # Strip a UTF-8 BOM if present so the fast path below succeeds
+    if content_bytes[:3] == b'\xef\xbb\xbf':
+        content_bytes = content_bytes[3:]
+
+    try:
+        return content_bytes.decode('utf-8')
+    except UnicodeDecodeError:
+        pass
+
+    # Reuse the encoding detected earlier in this crawl
+    if _detected_encoding:
         try:
-            return content_bytes.decode(encoding)
+            return content_bytes.decode(_detected_encoding)
         except (UnicodeDecodeError, LookupError):
-            continue
-    
+            pass
+
+    if from_bytes is not None:
+        best = from_bytes(content_bytes).best()
+        if best is not None:
+            _detected_encoding = best.encoding
+            return str(best)
+
     # If all fail, use latin-1 with errors='replace'
     return content_bytes.decode('latin-1', errors='replace')
 
+def fetch_tail(session, url):
+    """Fetch only the last TAIL_BYTES of a log via a Range request.
+
+    Falls back to streaming with a rolling tail buffer when the server
+    ignores the Range header, so the full body is never held in memory.
+    """
+    response = session.get(url, headers={'Range': f'bytes=-{TAIL_BYTES}'},
+                           stream=True, timeout=15)
+    response.raise_for_status()
+
+    if response.status_code == 206:  # Partial Content
+        return response.content
+
+    # Server returned the full body; keep only the last TAIL_BYTES
+    tail = b''
+    for chunk in response.iter_content(chunk_size=65536):
+        tail = (tail + chunk)[-TAIL_BYTES:]
+    return tail
+
 def get_last_non_empty_line(content):
-    """Get the last non-empty line from content"""
-    lines = content.strip().split('\n')
-    for line in reversed(lines):
-        if line.strip():
-            return line.strip()
+    """Get the last non-empty line from content via a reverse scan"""
+    # Walk backwards with rfind instead of splitting the whole content
+    # into a list of lines; only the tail is ever touched
+    end = len(content)
+    while end > 0:
+        start = content.rfind('\n', 0, end)
+        line = content[start + 1:end].strip()
+        if line:
+            return line
+        if start == -1:
+            break
+        end = start
     return ""
 
 def check_log_condition(content):
-    """Check if log meets the criteria based on last line"""
+    """Check if log meets the criteria based on last line.
+
+    The last line must be a result row (row[1] == "result") whose winner
+    column (row[4]) is WEREWOLF or VILLAGER.
+    """
     last_line = get_last_non_empty_line(content)
     if not last_line:
         return False
-    
+
+    # Result lines never contain quoted fields in practice; a plain split
+    # avoids the csv state machine. Fall back to csv only when quoting appears.
+    if '"' not in last_line:
+        parts = last_line.split(',')
+        return len(parts) >= 5 and parts[1] == 'result' and parts[4] in ('WEREWOLF', 'VILLAGER')
+
     try:
-        reader = csv.reader(io.StringIO(last_line))
-        row = next(reader)
-        
-        # Must have at least 4 columns
-        if len(row) < 4:
-            return False
-        
-        # Check conditions: row[0] == "result" and row[3] in {"WEREWOLF", "VILLAGER"}
-        return row[1] == "result" and row[4] in {"WEREWOLF", "VILLAGER"}
-    except (csv.Error, StopIteration, IndexError):
+        row = next(csv.reader(io.StringIO(last_line)))
+        return len(row) >= 5 and row[1] == 'result' and row[4] in ('WEREWOLF', 'VILLAGER')
+    except (csv.Error, StopIteration):
         return False
 
 def main():
@@ -102,28 +181,26 @@ def main():
     headers = {
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
     }
-    
+
+    # Reuse one pooled session for the whole crawl (all requests hit the same host)
+    session = make_session(headers)
+
     # Get starting game number for this directory
     start_game_num = get_existing_game_max(output_dir) + 1
     current_game_num = start_game_num
     
     try:
         print(f"Fetching directory page: {base_url}")
-        response = requests.get(base_url, headers=headers, timeout=15)
+        response = session.get(base_url, timeout=15)
         response.raise_for_status()
         
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Find all .log links
-        log_links = set()
-        for link in soup.find_all('a', href=True):
-            href = link['href']
-            if href.endswith('.log'):
-                # Skip parent directory links
-                if href.startswith('../') or 'Parent Directory' in link.get_text():
-                    continue
-                full_url = urljoin(base_url, href)
-                log_links.add(full_url)
+        # Extract all .log links directly from the HTML, skipping parent
+        # directory links; no DOM needs to be built for this
+        log_links = {
+            urljoin(base_url, href)
+            for href in _HREF_LOG_RE.findall(response.text)
+            if not href.startswith('../')
+        }
         
         log_links = list(log_links)  # Convert to list for ordering
         print(f"Found {len(log_links)} .log files")
@@ -131,36 +208,46 @@ def main():
         saved_files = []
         processed_count = 0
         link_records = []  # To store folder name and link pairs
-        
-        for url in log_links:
+
+        def fetch_and_check(url):
+            """Check one log via its tail; return (url, content, ok) with content=None if the criteria fail"""
             try:
-                print(f"Processing: {url}")
-                log_response = requests.get(url, headers=headers, timeout=15)
+                # Check the result line against just the tail first, so logs
+                # that fail the criteria never cost a full download
+                tail = fetch_tail(session, url)
+                if not check_log_condition(decode_content(tail)):
+                    return url, None, True
+
+                log_response = session.get(url, timeout=15)
                 log_response.raise_for_status()
-                
-                # Decode content
-                content = decode_content(log_response.content)
-                
-                # Check condition
-                if check_log_condition(content):
-                    # Save the file with .log extension
-                    output_path = os.path.join(output_dir, f"game{current_game_num}.log")
-                    with open(output_path, 'w', encoding='utf-8') as f:
-                        f.write(content)
-                    
-                    folder_name = f"game{current_game_num}"
-                    saved_files.append(folder_name)
-                    link_records.append({"folder_name": folder_name, "source_url": url})
-                    current_game_num += 1
-                    print(f"  -> Saved as {folder_name}.log")
-                else:
-                    print(f"  -> Skipped (conditions not met)")
-                
-                processed_count += 1
-                
+                return url, decode_content(log_response.content), True
             except Exception as e:
                 print(f"  -> Error processing {url}: {e}")
-                continue
+                return url, None, False
+
+        # Download in parallel (I/O-bound); assign game numbers in the main
+        # thread as results arrive so numbering stays sequential
+        with ThreadPoolExecutor(max_workers=MAX_DOWNLOAD_WORKERS) as executor:
+            for url, content, ok in executor.map(fetch_and_check, log_links):
+                if not ok:
+                    continue
+                print(f"Processing: {url}")
+                processed_count += 1
+
+                if content is None:
+                    print(f"  -> Skipped (conditions not met)")
+                    continue
+
+                # Save the file with .log extension
+                output_path = os.path.join(output_dir, f"game{current_game_num}.log")
+                with open(output_path, 'w', encoding='utf-8') as f:
+                    f.write(content)
+
+                folder_name = f"game{current_game_num}"
+                saved_files.append(folder_name)
+                link_records.append({"folder_name": folder_name, "source_url": url})
+                current_game_num += 1
+                print(f"  -> Saved as {folder_name}.log")
         
         # Save link records to CSV
         if link_records:
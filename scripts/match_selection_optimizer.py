@@ -1,12 +1,28 @@
 #!/usr/bin/env python3
 import json
 import os
+from pathlib import PurePath
 import numpy as np
+
+try:
+    import orjson  # much faster JSON codec; optional
+except ImportError:
+    orjson = None
+
+try:
+    import ijson  # streaming JSON parser for huge pattern files; optional
+except ImportError:
+    ijson = None
+
+# Pattern files at least this large are streamed instead of loaded whole
+STREAM_THRESHOLD_BYTES = 256 * 1024 * 1024
 from typing import Dict, List
 import pulp  # Integer Linear Programming
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 import pandas as pd
 import shutil
+import threading
 
 @dataclass
 class OptimizationResult:
@@ -26,9 +42,13 @@ class MatchSelectionOptimizer:
         self.idx_team_map = {}
         self.role_num_map = {}
         self.pattern_of_matches = []
+        self.n_matches = 0
         self.teams = []
         self.roles = []
         self.dataset_name = None
+        self._role_tensor = None
+        self._participation_matrix = None
+        self._role_matrices = None
 
         self.load_pattern_data()
 
@@ -37,69 +57,166 @@ class MatchSelectionOptimizer:
         if not os.path.exists(self.pattern_file_path):
             raise FileNotFoundError(f"Pattern file not found: {self.pattern_file_path}")
 
-        with open(self.pattern_file_path, 'r', encoding='utf-8') as f:
-            self.data = json.load(f)
+        if ijson is not None and os.path.getsize(self.pattern_file_path) >= STREAM_THRESHOLD_BYTES:
+            self._load_pattern_data_streaming()
+        else:
+            with open(self.pattern_file_path, 'rb') as f:
+                raw = f.read()
+            self.data = orjson.loads(raw) if orjson is not None else json.loads(raw)
 
-        self.idx_team_map = self.data['idx_team_map']
-        self.role_num_map = self.data['role_num_map']
-        self.pattern_of_matches = self.data['pattern_of_matches']
+            self.idx_team_map = self.data['idx_team_map']
+            self.role_num_map = self.data['role_num_map']
+            self.pattern_of_matches = self.data['pattern_of_matches']
+            self.n_matches = len(self.pattern_of_matches)
 
-        self.teams = list(self.idx_team_map.values())
-        self.roles = list(self.role_num_map.keys())
+            self.teams = list(self.idx_team_map.values())
+            self.roles = list(self.role_num_map.keys())
 
         # Extract dataset name from pattern file path
         # e.g. "data/pattern_of_matches/foo/pattern_of_matches.json" -> "foo"
-        path_parts = self.pattern_file_path.replace('\\', '/').split('/')
-        if 'pattern_of_matches' in path_parts:
-            pattern_idx = path_parts.index('pattern_of_matches')
-            if pattern_idx + 1 < len(path_parts):
-                self.dataset_name = path_parts[pattern_idx + 1]
-            else:
-                basename = os.path.basename(self.pattern_file_path)
-                self.dataset_name = basename.replace('pattern_of_matches_', '').replace('.json', '')
-        else:
-            basename = os.path.basename(self.pattern_file_path)
-            self.dataset_name = basename.replace('pattern_of_matches_', '').replace('.json', '')
+        path = PurePath(self.pattern_file_path)
+        try:
+            self.dataset_name = path.parts[path.parts.index('pattern_of_matches') + 1]
+        except (ValueError, IndexError):
+            self.dataset_name = path.stem.replace('pattern_of_matches_', '')
 
-        print(f"Loaded {len(self.pattern_of_matches)} matches with {len(self.teams)} teams")
+        print(f"Loaded {self.n_matches} matches with {len(self.teams)} teams")
         print(f"Teams: {', '.join(self.teams)}")
         print(f"Roles: {', '.join(self.roles)}")
 
-    def calculate_participation_matrix(self) -> np.ndarray:
-        """Calculate team participation matrix (matches x teams)"""
-        n_matches = len(self.pattern_of_matches)
+    def _load_pattern_data_streaming(self):
+        """Stream a huge pattern file with ijson in two passes.
+
+        The first pass collects the metadata maps and the match count; the
+        second writes each match straight into the role tensor, so the
+        list-of-dicts representation is never materialized in memory.
+        """
+        self.idx_team_map = {}
+        self.role_num_map = {}
+        n_matches = 0
+
+        with open(self.pattern_file_path, 'rb') as f:
+            for prefix, event, value in ijson.parse(f):
+                if event == 'start_map' and prefix == 'pattern_of_matches.item':
+                    n_matches += 1
+                elif prefix.startswith('idx_team_map.') and event == 'string':
+                    self.idx_team_map[prefix[len('idx_team_map.'):]] = value
+                elif prefix.startswith('role_num_map.') and event == 'number':
+                    self.role_num_map[prefix[len('role_num_map.'):]] = int(value)
+
+        self.n_matches = n_matches
+        self.teams = list(self.idx_team_map.values())
+        self.roles = list(self.role_num_map.keys())
+
         n_teams = len(self.teams)
+        role_index = {role: i for i, role in enumerate(self.roles)}
+        role_tensor = np.zeros((len(self.roles), n_matches, n_teams), dtype=np.int8)
+
+        with open(self.pattern_file_path, 'rb') as f:
+            for match_idx, match_data in enumerate(ijson.items(f, 'pattern_of_matches.item')):
+                for role, team_indices in match_data.items():
+                    r = role_index.get(role)
+                    if r is None:
+                        continue
+                    for team_idx in team_indices:
+                        if team_idx < n_teams:  # Ensure valid team index
+                            role_tensor[r, match_idx, team_idx] = 1
+
+        self._role_tensor = role_tensor
+        self.data = None
+        self.pattern_of_matches = None
 
-        participation_matrix = np.zeros((n_matches, n_teams), dtype=int)
+    def build_role_tensor(self) -> np.ndarray:
+        """Build the (roles x matches x teams) 0/1 assignment tensor.
+
+        Flat index triples are collected in one pass over the pattern data
+        and written with a single fancy-indexed assignment; the result is
+        cached so the ILP builder pays the cost at most once.
+        """
+        if self._role_tensor is not None:
+            return self._role_tensor
 
+        n_matches = self.n_matches
+        n_teams = len(self.teams)
+        role_index = {role: i for i, role in enumerate(self.roles)}
+
+        role_ix = []
+        match_ix = []
+        team_ix = []
         for match_idx, match_data in enumerate(self.pattern_of_matches):
-            participating_teams = set()
             for role, team_indices in match_data.items():
-                participating_teams.update(team_indices)
+                r = role_index.get(role)
+                if r is None:
+                    continue
+                for team_idx in team_indices:
+                    if team_idx < n_teams:  # Ensure valid team index
+                        role_ix.append(r)
+                        match_ix.append(match_idx)
+                        team_ix.append(team_idx)
 
-            for team_idx in participating_teams:
-                if team_idx < n_teams:  # Ensure valid team index
-                    participation_matrix[match_idx, team_idx] = 1
+        role_tensor = np.zeros((len(self.roles), n_matches, n_teams), dtype=np.int8)
+        if role_ix:
+            role_tensor[np.asarray(role_ix), np.asarray(match_ix), np.asarray(team_ix)] = 1
 
-        return participation_matrix
+        self._role_tensor = role_tensor
+        return role_tensor
+
+    def calculate_participation_matrix(self) -> np.ndarray:
+        """Calculate team participation matrix (matches x teams), memoized"""
+        if self._participation_matrix is None:
+            self._participation_matrix = (self.build_role_tensor().sum(axis=0) > 0).astype(np.int8)
+        return self._participation_matrix
 
     def calculate_role_assignment_matrix(self) -> Dict[str, np.ndarray]:
-        """Calculate role assignment matrices (matches x teams) for each role"""
-        n_matches = len(self.pattern_of_matches)
-        n_teams = len(self.teams)
+        """Calculate role assignment matrices (matches x teams) for each role, memoized"""
+        if self._role_matrices is None:
+            role_tensor = self.build_role_tensor()
+            self._role_matrices = {role: role_tensor[i] for i, role in enumerate(self.roles)}
+        return self._role_matrices
 
-        role_matrices = {}
-        for role in self.roles:
-            role_matrices[role] = np.zeros((n_matches, n_teams), dtype=int)
+    def make_solver(self, threads: int = None, time_limit: int = 300):
+        """Pick the fastest available MIP solver.
 
-        for match_idx, match_data in enumerate(self.pattern_of_matches):
-            for role, team_indices in match_data.items():
-                if role in role_matrices:
-                    for team_idx in team_indices:
-                        if team_idx < n_teams:  # Ensure valid team index
-                            role_matrices[role][match_idx, team_idx] = 1
+        Prefers HiGHS when installed (notably faster than CBC on MIPs),
+        falling back to multi-threaded CBC with a time limit.
+        """
+        if threads is None:
+            threads = os.cpu_count()
+        try:
+            highs = pulp.HiGHS_CMD(msg=0, threads=threads, timeLimit=time_limit, warmStart=True)
+            if highs.available():
+                return highs
+        except Exception:
+            pass
+        return pulp.PULP_CBC_CMD(msg=0, threads=threads, timeLimit=time_limit, warmStart=True)
 
-        return role_matrices
+    def greedy_warm_start(self, participation_matrix: np.ndarray, target_matches: int) -> set:
+        """Pick a feasible match selection greedily for use as a warm start.
+
+        Repeatedly selects the match that keeps the max-min gap of team
+        participation counts smallest. Any selection of the right size
+        satisfies the cardinality constraint, and a reasonable incumbent
+        lets branch-and-bound prune much earlier.
+        """
+        n_matches = participation_matrix.shape[0]
+        counts = np.zeros(participation_matrix.shape[1], dtype=np.int64)
+        selected = set()
+        remaining = list(range(n_matches))
+
+        for _ in range(min(target_matches, n_matches)):
+            best_match = None
+            best_gap = None
+            for m in remaining:
+                new_counts = counts + participation_matrix[m]
+                gap = int(new_counts.max() - new_counts.min())
+                if best_gap is None or gap < best_gap:
+                    best_match = m
+                    best_gap = gap
+            selected.add(best_match)
+            remaining.remove(best_match)
+            counts += participation_matrix[best_match]
+
+        return selected
 
     def solve_ilp_optimization(
         self,
@@ -107,7 +224,8 @@ class MatchSelectionOptimizer:
         balance_weight: float = 1.0,
         max_zero_roles_per_team: int = 0,
         count_only_seen_roles: bool = True,
-        require_min_participation: bool = True
+        require_min_participation: bool = True,
+        solver_threads: int = None
     ) -> OptimizationResult:
         """
         Solve optimization using Integer Linear Programming with extra constraints:
@@ -116,7 +234,7 @@ class MatchSelectionOptimizer:
           ※ count_only_seen_roles=True のとき、データ上一度も担当していない(t,r)は“0回”の計算に含めない
         - require_min_participation: True のとき各チームの総出場 >= 1 を強制
         """
-        n_matches = len(self.pattern_of_matches)
+        n_matches = self.n_matches
         n_teams = len(self.teams)
 
         if target_matches is None:
@@ -146,31 +264,34 @@ class MatchSelectionOptimizer:
         role_matrices = self.calculate_role_assignment_matrix()
 
         # Constraint 1: exactly target number of matches
-        prob += pulp.lpSum([match_vars[i] for i in range(n_matches)]) == target_matches
+        prob += pulp.LpAffineExpression(
+            [(match_vars[m], 1) for m in range(n_matches)]
+        ) == target_matches
 
         # Constraint 2: team participation calculation
+        # Build expressions from the nonzero matrix columns only, so matches
+        # a team never plays in contribute no terms at all
         for team_idx in range(n_teams):
-            prob += team_participation_vars[team_idx] == pulp.lpSum([
-                participation_matrix[m, team_idx] * match_vars[m] for m in range(n_matches)
-            ])
+            nonzero = np.nonzero(participation_matrix[:, team_idx])[0]
+            prob += team_participation_vars[team_idx] == pulp.LpAffineExpression(
+                [(match_vars[m], 1) for m in nonzero]
+            )
 
         # Constraint 3: role assignment calculation
         for team_idx in range(n_teams):
             for role in self.roles:
-                prob += team_role_vars[team_idx][role] == pulp.lpSum([
-                    role_matrices[role][m, team_idx] * match_vars[m] for m in range(n_matches)
-                ])
+                nonzero = np.nonzero(role_matrices[role][:, team_idx])[0]
+                prob += team_role_vars[team_idx][role] == pulp.LpAffineExpression(
+                    [(match_vars[m], 1) for m in nonzero]
+                )
 
         # ----- New constraints: control "zero-count roles" per team -----
         # 判定: その(t,r)がデータ上一度でも発生しているか（見たことがある役職担当か）
-        seen = {}
-        for team_idx in range(n_teams):
-            for role in self.roles:
-                seen[(team_idx, role)] = any(role_matrices[role][m, team_idx] == 1 for m in range(n_matches))
+        # per role: boolean vector over teams, computed in one reduction
+        seen = {role: role_matrices[role].any(axis=0) for role in self.roles}
 
         # w[t][r] = 1 なら「役職rを1回以上担当」、0なら「0回」
         w_vars = {team_idx: {} for team_idx in range(n_teams)}
-        BIG_M = n_matches  # 十分大きい上限
 
         for team_idx in range(n_teams):
             for role in self.roles:
@@ -178,15 +299,25 @@ class MatchSelectionOptimizer:
                 if self.role_num_map.get(role, 0) <= 0:
                     continue
                 # 見かけたことがない(t,r)をゼロ計数から外す場合はスキップ
-                if count_only_seen_roles and not seen[(team_idx, role)]:
+                if count_only_seen_roles and not seen[role][team_idx]:
+                    continue
+
+                # Tightest valid Big-M: the team can take this role at most
+                # once per match where the data assigns it, capped by the
+                # number of matches we will select
+                cap = int(role_matrices[role][:, team_idx].sum())
+                if cap == 0:
+                    # Role is impossible for this team; y is fixed at 0
                     continue
 
+                y = team_role_vars[team_idx][role]
+                y.upBound = cap  # static bound tightens the LP relaxation
+
                 w = pulp.LpVariable(f"w_team_{team_idx}_role_{role}", cat='Binary')
                 w_vars[team_idx][role] = w
-                y = team_role_vars[team_idx][role]
                 # w=1 → y>=1, w=0 → y<=0
                 prob += y >= w  # y >= 1*w
-                prob += y <= BIG_M * w
+                prob += y <= min(target_matches, cap) * w
 
         # 各チームの「0回役職数」の上限
         if max_zero_roles_per_team is not None:
@@ -224,8 +355,30 @@ class MatchSelectionOptimizer:
 
         prob += objective
 
+        # ----- Warm start: seed the solver with a greedy feasible incumbent -----
+        greedy_selected = self.greedy_warm_start(participation_matrix, target_matches)
+        sel_list = sorted(greedy_selected)
+        for i in range(n_matches):
+            match_vars[i].setInitialValue(1 if i in greedy_selected else 0)
+
+        # Propagate the selection into the auxiliary variables
+        part_counts = participation_matrix[sel_list].sum(axis=0)
+        for team_idx in range(n_teams):
+            team_participation_vars[team_idx].setInitialValue(int(part_counts[team_idx]))
+            for role in self.roles:
+                role_count = int(role_matrices[role][sel_list, team_idx].sum())
+                team_role_vars[team_idx][role].setInitialValue(role_count)
+                if role in w_vars[team_idx]:
+                    w_vars[team_idx][role].setInitialValue(1 if role_count >= 1 else 0)
+        max_participation.setInitialValue(int(part_counts.max()))
+        min_participation.setInitialValue(int(part_counts.min()))
+        for role, (max_var, min_var) in role_balance_vars.items():
+            role_counts = role_matrices[role][sel_list].sum(axis=0)
+            max_var.setInitialValue(int(role_counts.max()))
+            min_var.setInitialValue(int(role_counts.min()))
+
         print(f"Solving optimization for {target_matches} matches...")
-        prob.solve(pulp.PULP_CBC_CMD(msg=0))  # CBC solver silently
+        prob.solve(self.make_solver(threads=solver_threads))
 
         status = pulp.LpStatus[prob.status]
         selected_matches = []
@@ -259,8 +412,20 @@ class MatchSelectionOptimizer:
             optimization_status=status
         )
 
-    def display_results(self, result: OptimizationResult):
-        """Display optimization results"""
+    def result_arrays(self, result: OptimizationResult):
+        """Materialize result counts as a (teams x roles) matrix and a
+        participation vector, shared by display and table output"""
+        role_count_mat = np.array(
+            [[result.team_role_counts[t][r] for r in self.roles] for t in self.teams],
+            dtype=np.int32
+        )
+        part_vec = np.array([result.team_participation[t] for t in self.teams], dtype=np.int32)
+        return role_count_mat, part_vec
+
+    def display_results(self, result: OptimizationResult, arrays=None):
+        """Display optimization results; returns the stat arrays for reuse"""
+        role_count_mat, part_vec = arrays if arrays is not None else self.result_arrays(result)
+
         print(f"\n=== Optimization Results ===")
         print(f"Status: {result.optimization_status}")
         print(f"Selected matches: {result.total_matches}")
@@ -271,12 +436,11 @@ class MatchSelectionOptimizer:
             print(f"{team}: {count} matches")
 
         # Participation stats
-        participations = list(result.team_participation.values())
-        if participations:
+        if part_vec.size:
             print(f"\nParticipation Statistics:")
-            print(f"  Mean: {np.mean(participations):.2f}")
-            print(f"  Std Dev: {np.std(participations):.2f}")
-            print(f"  Min: {min(participations)}, Max: {max(participations)}")
+            print(f"  Mean: {part_vec.mean():.2f}")
+            print(f"  Std Dev: {part_vec.std():.2f}")
+            print(f"  Min: {part_vec.min()}, Max: {part_vec.max()}")
 
         print(f"\n=== Role Distribution by Team ===")
         df_data = []
@@ -290,38 +454,45 @@ class MatchSelectionOptimizer:
         print(df.to_string(index=False))
 
         print(f"\n=== Role Balance Statistics ===")
-        for role in self.roles:
+        # One pass over the (teams x roles) matrix instead of per-role list builds
+        role_means = role_count_mat.mean(axis=0)
+        role_stds = role_count_mat.std(axis=0)
+        role_mins = role_count_mat.min(axis=0)
+        role_maxs = role_count_mat.max(axis=0)
+        for i, role in enumerate(self.roles):
             if self.role_num_map.get(role, 0) > 0:
-                role_counts = [result.team_role_counts[team][role] for team in self.teams]
                 print(f"{role}:")
-                print(f"  Mean: {np.mean(role_counts):.2f}")
-                print(f"  Std Dev: {np.std(role_counts):.2f}")
-                print(f"  Min: {min(role_counts)}, Max: {max(role_counts)}")
+                print(f"  Mean: {role_means[i]:.2f}")
+                print(f"  Std Dev: {role_stds[i]:.2f}")
+                print(f"  Min: {role_mins[i]}, Max: {role_maxs[i]}")
+
+        return role_count_mat, part_vec
 
     def save_results(self, result: OptimizationResult, output_path: str):
         """Save optimization results to JSON file"""
-        selected_matches = [int(x) for x in result.selected_matches]
-        team_participation = {k: int(v) for k, v in result.team_participation.items()}
-        team_role_counts = {team: {role: int(count) for role, count in roles.items()}
-                            for team, roles in result.team_role_counts.items()}
-
+        # Values are already plain Python int/float (coerced when the result
+        # was built in solve_ilp_optimization), so no rebuild is needed here
         output_data = {
             'optimization_status': result.optimization_status,
-            'total_matches_selected': int(result.total_matches),
-            'balance_score': float(result.balance_score),
-            'selected_match_indices': selected_matches,
-            'team_participation': team_participation,
-            'team_role_counts': team_role_counts,
+            'total_matches_selected': result.total_matches,
+            'balance_score': result.balance_score,
+            'selected_match_indices': result.selected_matches,
+            'team_participation': result.team_participation,
+            'team_role_counts': result.team_role_counts,
             'original_data': {
                 'idx_team_map': self.idx_team_map,
                 'role_num_map': self.role_num_map,
-                'total_available_matches': len(self.pattern_of_matches)
+                'total_available_matches': self.n_matches
             }
         }
 
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(output_data, f, indent=2, ensure_ascii=False)
+        if orjson is not None:
+            with open(output_path, 'wb') as f:
+                f.write(orjson.dumps(output_data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        else:
+            with open(output_path, 'w', encoding='utf-8') as f:
+                json.dump(output_data, f, indent=2, ensure_ascii=False)
         print(f"\nResults saved to: {output_path}")
 
     def copy_selected_files(self, result: OptimizationResult):
@@ -342,21 +513,38 @@ class MatchSelectionOptimizer:
         os.makedirs(dest_dir, exist_ok=True)
 
         copied_count = 0
+        copy_jobs = []
         for match_idx in result.selected_matches:
             game_name = f"game{match_idx + 1}"  # game indices start from 1
             source_file = os.path.join(source_dir, game_name)
             dest_file = os.path.join(dest_dir, game_name)
 
-            if os.path.exists(source_file):
-                shutil.copy2(source_file, dest_file)
-                copied_count += 1
-            else:
+            if not os.path.exists(source_file):
                 print(f"Warning: Game file not found: {source_file}")
+                continue
+
+            # Hardlink when source and destination share a filesystem:
+            # O(1), no bytes moved. Cross-device links fall back to a real copy.
+            try:
+                if os.path.exists(dest_file):
+                    os.remove(dest_file)
+                os.link(source_file, dest_file)
+                copied_count += 1
+            except OSError:
+                copy_jobs.append((source_file, dest_file))
+
+        # Real copies run in parallel; copyfile uses kernel-side sendfile on Linux
+        if copy_jobs:
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                list(executor.map(lambda job: shutil.copyfile(*job), copy_jobs))
+            copied_count += len(copy_jobs)
 
         print(f"\nCopied {copied_count} game files to: {dest_dir}")
 
-    def save_table(self, result: OptimizationResult):
+    def save_table(self, result: OptimizationResult, arrays=None):
         """Save optimization results as a table in the table directory"""
+        role_count_mat, part_vec = arrays if arrays is not None else self.result_arrays(result)
+
         if not self.dataset_name:
             print("Warning: Dataset name not available")
             return
@@ -380,15 +568,21 @@ class MatchSelectionOptimizer:
         df.to_csv(csv_path, index=False)
         print(f"Role distribution table saved to: {csv_path}")
 
-        try:
-            excel_path = os.path.join(table_dir, f"role_distribution_{self.dataset_name}.xlsx")
-            df.to_excel(excel_path, index=False)
-            print(f"Role distribution table saved to: {excel_path}")
-        except ImportError:
-            pass
+        # The Excel copy is cosmetic (the CSV above is authoritative) and
+        # openpyxl is slow, so write it on a background thread while the
+        # remaining CSVs proceed; non-daemon so it finishes before exit
+        excel_path = os.path.join(table_dir, f"role_distribution_{self.dataset_name}.xlsx")
+
+        def write_excel():
+            try:
+                df.to_excel(excel_path, index=False)
+                print(f"Role distribution table saved to: {excel_path}")
+            except ImportError:
+                pass
+
+        threading.Thread(target=write_excel, daemon=False).start()
 
         # Summary table
-        participations = list(result.team_participation.values())
         summary_data = {
             'Metric': [
                 'Total Matches Selected',
@@ -403,10 +597,10 @@ class MatchSelectionOptimizer:
                 result.total_matches,
                 f"{result.balance_score:.2f}",
                 result.optimization_status,
-                f"{np.mean(participations):.2f}" if participations else "0.00",
-                f"{np.std(participations):.2f}" if participations else "0.00",
-                min(participations) if participations else 0,
-                max(participations) if participations else 0,
+                f"{part_vec.mean():.2f}" if part_vec.size else "0.00",
+                f"{part_vec.std():.2f}" if part_vec.size else "0.00",
+                int(part_vec.min()) if part_vec.size else 0,
+                int(part_vec.max()) if part_vec.size else 0,
             ]
         }
         summary_df = pd.DataFrame(summary_data)
@@ -483,12 +677,16 @@ def main():
         min_part_flag = input("Require each team to appear at least once? [Y/n] (Enter=Y): ").strip().lower()
         require_min_participation = (min_part_flag != 'n')
 
+        threads_in = input("Solver threads (Enter = all cores): ").strip()
+        solver_threads = int(threads_in) if threads_in else None
+
     except (ValueError, EOFError):
         print("Using default parameters")
         target_matches = None
         max_zero_roles_per_team = 0
         count_only_seen_roles = True
         require_min_participation = True
+        solver_threads = None
 
     # Optimize (ILP only)
     optimizer = MatchSelectionOptimizer(pattern_file_path)
@@ -498,15 +696,16 @@ def main():
         balance_weight=1.0,
         max_zero_roles_per_team=max_zero_roles_per_team,
         count_only_seen_roles=count_only_seen_roles,
-        require_min_participation=require_min_participation
+        require_min_participation=require_min_participation,
+        solver_threads=solver_threads
     )
 
-    # Display & save
-    optimizer.display_results(result)
+    # Display & save (the stat arrays are computed once and shared)
+    arrays = optimizer.display_results(result)
 
     if result.total_matches > 0:
         optimizer.copy_selected_files(result)
-        optimizer.save_table(result)
+        optimizer.save_table(result, arrays=arrays)
 
 if __name__ == "__main__":
     main()
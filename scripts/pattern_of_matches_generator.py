@@ -2,145 +2,235 @@
 import os
 import re
 import json
+import tempfile
 from collections import defaultdict
-from typing import Dict, List, Set
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Dict, List, Set, Tuple
+
+try:
+    import orjson  # much faster JSON codec; optional
+except ImportError:
+    orjson = None
+
+# Precompiled hot-path pattern for game numbers in filenames
+_GAME_RE = re.compile(r'game(\d+)')
+
+# Roles tracked by the generator; the tuple fixes a deterministic key order
+# for output entries without re-iterating the set per game
+_TARGET_ROLES = frozenset({'BODYGUARD', 'MEDIUM', 'POSSESSED', 'SEER', 'VILLAGER', 'WEREWOLF'})
+_ROLE_ORDER = tuple(sorted(_TARGET_ROLES))
+
+# Bytes-keyed view of the role set: game files are read in binary mode and
+# only the fields of accepted rows are ever decoded
+_ROLE_BY_BYTES = {role.encode('utf-8'): role for role in _TARGET_ROLES}
+
+# Static role counts per game configuration
+_ROLE_NUM_MAP_5 = {
+    "BODYGUARD": 0,
+    "MEDIUM": 0,
+    "POSSESSED": 1,
+    "SEER": 1,
+    "VILLAGER": 2,
+    "WEREWOLF": 1
+}
+_ROLE_NUM_MAP_13 = {
+    "BODYGUARD": 1,
+    "MEDIUM": 1,
+    "POSSESSED": 1,
+    "SEER": 1,
+    "VILLAGER": 6,
+    "WEREWOLF": 3
+}
+
+def normalize_team_name(team_name: str) -> str:
+    """Normalize team name by removing suffix patterns like -A1, -B1, etc."""
+    # Remove patterns like -A1, -B1, -C5 (dash followed by letter and number)
+    # using C-level string ops instead of the regex engine
+    i = team_name.rfind('-')
+    if i == -1:
+        return team_name
+    tail = team_name[i + 1:]
+    if tail and tail[0].isalpha() and tail[1:].isdigit():
+        return team_name[:i]
+    return team_name
+
+def parse_game_file(filepath: str, max_lines: int) -> Tuple[List[str], Dict[str, List[str]]]:
+    """Parse a single game file and extract role assignments for specified number of lines.
+
+    Pure function, safe to run in worker processes: team NAMES are returned
+    (first-appearance order plus a role -> names map) so the parent process
+    can assign team indices deterministically.
+    """
+    ordered_teams = []
+    seen_teams = set()
+    role_assignments = defaultdict(set)
+
+    # LOAD_FAST beats LOAD_GLOBAL in the per-line loop, which runs once per
+    # examined row across every file in the directory
+    role_by_bytes = _ROLE_BY_BYTES
+    normalize = normalize_team_name
+
+    # Stream only the first max_lines (5 or 13) through buffered I/O in
+    # binary mode: rejected rows are never UTF-8 decoded at all, and
+    # accepted rows decode only the team field
+    with open(filepath, 'rb') as f:
+        for line in islice(f, max_lines):
+            # Cheap rejection before splitting anything
+            if b',status,' not in line:
+                continue
+
+            # maxsplit=6: fields beyond index 5 are never used. The length
+            # guard covers every index accessed below, so no try/except
+            # frame is needed per line
+            parts = line.split(b',', 6)
+            if len(parts) >= 7 and parts[1] == b'status':
+                # Format: day,status,player_id,role,status,team,name
+                # One dict lookup both filters on target roles and maps the
+                # raw bytes back to the str role name
+                role = role_by_bytes.get(parts[3])
+                if role is not None:
+                    team = parts[5].decode('utf-8')
+                    normalized_team = normalize(team)
+
+                    if normalized_team not in seen_teams:
+                        seen_teams.add(normalized_team)
+                        ordered_teams.append(normalized_team)
+
+                    # Sets deduplicate in O(1) per add
+                    role_assignments[role].add(normalized_team)
+
+    return ordered_teams, {role: sorted(teams) for role, teams in role_assignments.items()}
 
 class PatternOfMatchesGenerator:
+    SAMPLE_SIZE = 3  # pattern entries kept in memory for the sample print
+
     def __init__(self):
         self.team_to_index = {}
         self.index_to_team = {}
-        self.pattern_of_matches = []
+        self.match_count = 0
+        self.sample_entries = []
         self.role_num_map = {}
-        self.target_roles = {'BODYGUARD', 'MEDIUM', 'POSSESSED', 'SEER', 'VILLAGER', 'WEREWOLF'}
+        self.target_roles = _TARGET_ROLES
+        # Pattern entries are spooled to disk as they are produced instead of
+        # accumulating in memory; save_to_file streams them into the output
+        self._spool_path = None
         
-    def normalize_team_name(self, team_name: str) -> str:
-        """Normalize team name by removing suffix patterns like -A1, -B1, etc."""
-        # Remove patterns like -A1, -B1, -C5 (dash followed by letter and number)
-        normalized = re.sub(r'-[A-Za-z]\d+$', '', team_name)
-        return normalized
-    
     def setup_role_num_map(self, player_count: int):
         """Setup role_num_map based on player count"""
         if player_count == 5:
-            self.role_num_map = {
-                "BODYGUARD": 0,
-                "MEDIUM": 0,
-                "POSSESSED": 1,
-                "SEER": 1,
-                "VILLAGER": 2,
-                "WEREWOLF": 1
-            }
+            self.role_num_map = _ROLE_NUM_MAP_5
         elif player_count == 13:
-            self.role_num_map = {
-                "BODYGUARD": 1,
-                "MEDIUM": 1,
-                "POSSESSED": 1,
-                "SEER": 1,
-                "VILLAGER": 6,
-                "WEREWOLF": 3
-            }
+            self.role_num_map = _ROLE_NUM_MAP_13
         else:
             raise ValueError(f"Unsupported player count: {player_count}. Must be 5 or 13.")
     
-    def parse_game_file(self, filepath: str, max_lines: int) -> Dict[str, List[int]]:
-        """Parse a single game file and extract role assignments for specified number of lines"""
-        role_assignments = defaultdict(list)
-        
-        with open(filepath, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-        
-        # Process only the first max_lines
-        processed_lines = 0
-        for line in lines:
-            if processed_lines >= max_lines:
-                break
-                
-            line = line.strip()
-            if not line:
-                continue
-                
-            try:
-                parts = line.split(',')
-                if len(parts) >= 7 and parts[1] == 'status':
-                    # Format: day,status,player_id,role,status,team,name
-                    role = parts[3]
-                    team = parts[5]
-                    
-                    # Only process target roles
-                    if role in self.target_roles:
-                        normalized_team = self.normalize_team_name(team)
-                        
-                        # Add team to mapping if not exists
-                        if normalized_team not in self.team_to_index:
-                            team_idx = len(self.team_to_index)
-                            self.team_to_index[normalized_team] = team_idx
-                            self.index_to_team[str(team_idx)] = normalized_team
-                        
-                        team_idx = self.team_to_index[normalized_team]
-                        
-                        # Add to role assignments if not already added
-                        if team_idx not in role_assignments[role]:
-                            role_assignments[role].append(team_idx)
-                
-                processed_lines += 1
-                
-            except (IndexError, ValueError) as e:
-                continue
-        
-        # Sort the team indices for each role to ensure consistent ordering
-        for role in role_assignments:
-            role_assignments[role].sort()
-        
-        return dict(role_assignments)
-    
     def process_directory(self, directory_path: str, max_lines: int):
         """Process all game files in a directory"""
         if not os.path.exists(directory_path):
             print(f"Directory not found: {directory_path}")
             return
         
-        # Get all game files
-        game_files = [f for f in os.listdir(directory_path) 
-                     if f.startswith('game') and os.path.isfile(os.path.join(directory_path, f))]
-        
-        if not game_files:
+        # Get all game files; DirEntry caches is_file() from the directory
+        # read itself, avoiding a stat call per entry, and carries the full
+        # path so nothing needs os.path.join later
+        with os.scandir(directory_path) as it:
+            game_entries = [(e.name, e.path) for e in it
+                            if e.name.startswith('game') and e.is_file()]
+
+        if not game_entries:
             print(f"No game files found in {directory_path}")
             return
-        
+
         # Sort game files numerically
-        game_files.sort(key=lambda x: int(re.search(r'game(\d+)', x).group(1)) if re.search(r'game(\d+)', x) else 0)
-        
-        print(f"Processing {len(game_files)} game files with first {max_lines} lines each...")
-        
-        # Process each game file
-        for game_file in game_files:
-            filepath = os.path.join(directory_path, game_file)
-            print(f"Processing {game_file}...")
-            
-            role_assignments = self.parse_game_file(filepath, max_lines)
-            
-            # Create pattern entry for this game
-            pattern_entry = {}
-            for role in self.target_roles:
-                pattern_entry[role] = role_assignments.get(role, [])
-            
-            self.pattern_of_matches.append(pattern_entry)
-    
+        game_entries.sort(key=lambda x: int(m.group(1)) if (m := _GAME_RE.search(x[0])) else 0)
+
+        print(f"Processing {len(game_entries)} game files with first {max_lines} lines each...")
+
+        filepaths = [path for _, path in game_entries]
+
+        spool_fd, self._spool_path = tempfile.mkstemp(suffix='.jsonl')
+
+        # Parse the independent files in parallel; team indices are assigned
+        # here in the parent, in submission order, so numbering stays
+        # deterministic regardless of worker scheduling. Entries are spooled
+        # to disk one JSON line at a time, keeping peak memory constant.
+        with os.fdopen(spool_fd, 'w', encoding='utf-8') as spool, \
+                ProcessPoolExecutor() as executor:
+            results = executor.map(parse_game_file, filepaths,
+                                   [max_lines] * len(filepaths), chunksize=8)
+            for i, (ordered_teams, role_teams) in enumerate(results, 1):
+                # One progress line per 100 files instead of one per file;
+                # per-file prints serialize the loop on stdout writes
+                if i % 100 == 0:
+                    print(f"Processing {i}/{len(filepaths)}...")
+
+                # Register teams in file-appearance order; one .get covers
+                # both the membership test and the index fetch
+                team_to_index = self.team_to_index
+                for team in ordered_teams:
+                    team_idx = team_to_index.get(team)
+                    if team_idx is None:
+                        team_idx = len(team_to_index)
+                        team_to_index[team] = team_idx
+                        self.index_to_team[team_idx] = team
+
+                # Create pattern entry for this game, in deterministic role
+                # order. Team indices grow with first appearance, so the
+                # mapped lists are usually already nondecreasing; sort only
+                # when an out-of-order pair is actually detected
+                pattern_entry = {}
+                for role in _ROLE_ORDER:
+                    indices = [team_to_index[t] for t in role_teams.get(role, ())]
+                    if any(indices[j] < indices[j - 1] for j in range(1, len(indices))):
+                        indices.sort()
+                    pattern_entry[role] = indices
+
+                if orjson is not None:
+                    spool.write(orjson.dumps(pattern_entry).decode())
+                else:
+                    spool.write(json.dumps(pattern_entry, ensure_ascii=False))
+                spool.write('\n')
+
+                if len(self.sample_entries) < self.SAMPLE_SIZE:
+                    self.sample_entries.append(pattern_entry)
+                self.match_count += 1
+
     def generate_output(self) -> Dict:
-        """Generate the final output structure"""
+        """Generate the output metadata (the pattern entries stay on the spool)"""
+        # Keys are ints internally; stringify once here for JSON compatibility
         return {
-            "idx_team_map": self.index_to_team,
+            "idx_team_map": {str(k): v for k, v in self.index_to_team.items()},
             "role_num_map": self.role_num_map,
-            "pattern_of_matches": self.pattern_of_matches
         }
-    
+
     def save_to_file(self, output_path: str, data: Dict):
-        """Save the pattern data to a JSON file"""
+        """Save the pattern data to a JSON file, streaming entries from the spool"""
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        
+
+        if orjson is not None:
+            dumps = lambda obj: orjson.dumps(obj).decode()
+        else:
+            dumps = lambda obj: json.dumps(obj, ensure_ascii=False)
+
         with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
-        
+            f.write('{"idx_team_map": ')
+            f.write(dumps(data["idx_team_map"]))
+            f.write(', "role_num_map": ')
+            f.write(dumps(data["role_num_map"]))
+            f.write(', "pattern_of_matches": [')
+            if self._spool_path is not None:
+                with open(self._spool_path, 'r', encoding='utf-8') as spool:
+                    for i, line in enumerate(spool):
+                        if i:
+                            f.write(', ')
+                        f.write(line.rstrip('\n'))
+            f.write(']}')
+
+        if self._spool_path is not None:
+            os.remove(self._spool_path)
+            self._spool_path = None
+
         print(f"Pattern of matches saved to: {output_path}")
 
 def main():
@@ -166,7 +256,8 @@ def main():
         print(f"Base directory not found: {base_dir}")
         return
     
-    subdirs = [d for d in os.listdir(base_dir) if os.path.isdir(os.path.join(base_dir, d))]
+    with os.scandir(base_dir) as it:
+        subdirs = [e.name for e in it if e.is_dir()]
     
     if not subdirs:
         print(f"No subdirectories found in {base_dir}")
@@ -205,16 +296,16 @@ def main():
     # Process directory
     generator.process_directory(data_path, player_count)
     
-    if not generator.pattern_of_matches:
+    if not generator.match_count:
         print("No pattern data generated. Please check the game files.")
         return
-    
+
     # Generate output
     output_data = generator.generate_output()
-    
+
     # Show summary
     print(f"\n=== Summary ===")
-    print(f"Total games processed: {len(generator.pattern_of_matches)}")
+    print(f"Total games processed: {generator.match_count}")
     print(f"Total teams found: {len(generator.team_to_index)}")
     print(f"Teams: {', '.join(generator.index_to_team.values())}")
     
@@ -231,12 +322,15 @@ def main():
     sample_data = {
         "idx_team_map": output_data["idx_team_map"],
         "role_num_map": output_data["role_num_map"],
-        "pattern_of_matches": output_data["pattern_of_matches"][:3] if len(output_data["pattern_of_matches"]) >= 3 else output_data["pattern_of_matches"]
+        "pattern_of_matches": generator.sample_entries
     }
-    print(json.dumps(sample_data, indent=2))
-    
-    if len(output_data["pattern_of_matches"]) > 3:
-        print(f"... and {len(output_data['pattern_of_matches']) - 3} more matches")
+    if orjson is not None:
+        print(orjson.dumps(sample_data, option=orjson.OPT_INDENT_2).decode())
+    else:
+        print(json.dumps(sample_data, indent=2))
+
+    if generator.match_count > len(generator.sample_entries):
+        print(f"... and {generator.match_count - len(generator.sample_entries)} more matches")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file